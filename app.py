@@ -1,6 +1,9 @@
+import io
+import json
+
 import streamlit as st
 import numpy as np
-import joblib
+import pandas as pd
 
 # Educational content for features (excluding dropped features)
 FEATURE_EDUCATION = {
@@ -48,8 +51,28 @@ FEATURE_EDUCATION = {
     }
 }
 
-# Custom CSS for better styling
-st.markdown("""
+# Measurement guidance HTML per feature, built once at import
+FEATURE_EDUCATION_HTML = {
+    feature: f"""
+        <div class="measurement-tip">
+            <strong>📋 How to measure:</strong> {info['how_to_measure']}<br>
+            <strong>💡 Clinical tips:</strong> {info['tips']}<br>
+            <strong>📊 Normal range:</strong> {info['normal_range']}
+        </div>
+        """
+    for feature, info in FEATURE_EDUCATION.items()
+}
+
+# Input constraints for integer-valued features; everything else is a non-negative float
+FEATURE_INPUTS = {
+    'pregnancies': {'min_value': 0, 'max_value': 20, 'value': 0, 'step': 1},
+    'age': {'min_value': 0, 'max_value': 120, 'value': 30, 'step': 1}
+}
+DEFAULT_INPUT = {'min_value': 0.0, 'max_value': None, 'value': 0.0, 'step': 0.1}
+
+# Custom CSS for better styling. st.html passes the style block through
+# as-is instead of running it through the markdown parser.
+st.html("""
 <style>
     .info-box {
         background-color: #f0f8ff;
@@ -68,18 +91,78 @@ st.markdown("""
         margin-top: 0.5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+""")
+
+# Predict with the booster's in-place predictor, which skips the sklearn
+# wrapper and DMatrix construction. The returned function maps a 2-D
+# float32 feature matrix to (classes, risk probabilities). Only
+# binary:logistic models are loaded, so inplace_predict returns the
+# positive-class probability as a 1-D array.
+def make_predictor(model):
+    booster = model.get_booster()
 
-# Load model and features with error handling
-@st.cache_resource
+    def predict_risk(input_array):
+        risk = booster.inplace_predict(input_array, validate_features=False)
+        return (risk > 0.5).astype(int), risk
+    return predict_risk
+
+# Load model and features with error handling. st.cache_resource keeps a
+# single copy per process, shared by every session, so the log line below
+# should appear once per server start. xgboost is imported here, after the
+# page header has rendered, and only once per process.
+@st.cache_resource(show_spinner=False)
 def load_model_data():
+    import xgboost as xgb
+
+    print("Loading diabetes model (once per process)")
     try:
-        model = joblib.load("diabetes_model.pkl")
-        features = joblib.load("model_features.pkl")
-        return model, features
-    except FileNotFoundError:
-        st.error("❌ Model files not found. Please ensure 'diabetes_model.pkl' and 'model_features.pkl' are in the same directory.")
-        return None, None
+        model = xgb.XGBClassifier()
+        model.load_model("diabetes_model.ubj")
+        with open("model_features.json") as f:
+            features = tuple(json.load(f))
+    except (FileNotFoundError, xgb.core.XGBoostError):
+        st.error("❌ Model files not found. Please ensure 'diabetes_model.ubj' and 'model_features.json' are in the same directory.")
+        return None, None, None
+
+    if model.objective != "binary:logistic":
+        st.error(f"❌ Unsupported model objective '{model.objective}'. Expected a 'binary:logistic' classifier.")
+        return None, None, None
+    return make_predictor(model), features, tuple(feature.lower() for feature in features)
+
+# Form submit callback: rebuild the session's input row from the
+# defaults plus the cumulative cell edits. Cleared cells become NaN.
+def update_input_row(features, default_row):
+    input_row = st.session_state.input_row
+    input_row[:] = default_row
+    editor_state = st.session_state.get("patient_data", {})
+    for feature, value in editor_state.get("edited_rows", {}).get(0, {}).items():
+        input_row[0, features.index(feature)] = np.nan if value is None else value
+
+# Score one patient; repeated submissions of the same values hit the cache.
+# np.asarray is a no-op view for the session's float32 row.
+@st.cache_data(show_spinner=False, max_entries=1000)
+def score(input_row):
+    predictions, risk = predict_risk(np.asarray(input_row, dtype=np.float32).reshape(1, -1))
+    return int(predictions[0]), float(risk[0])
+
+# Score a whole CSV of patients with a single vectorized predict call.
+# Cached on the uploaded bytes so reruns don't predict again; the cache is
+# shared by all sessions, so only the most recent uploads are kept.
+@st.cache_data(show_spinner=False, max_entries=20)
+def predict_batch(csv_bytes):
+    df = pd.read_csv(io.BytesIO(csv_bytes))
+    missing = [feature for feature in features if feature not in df.columns]
+    if missing:
+        return None, missing
+    input_array = df[list(features)].to_numpy(dtype=np.float32)
+    # Blank (NaN) or negative values are rejected, as in the single-patient form
+    valid = (input_array >= 0).all(axis=1)
+    df["Prediction"] = "Invalid input"
+    if valid.any():
+        predictions, risk = predict_risk(input_array[valid])
+        df.loc[valid, "Prediction"] = np.where(predictions == 1, "High Risk", "Low Risk")
+        df.loc[valid, "Risk Probability (%)"] = (risk * 100).astype(float).round(1)
+    return df, []
 
 # Page setup
 st.set_page_config(page_title="Diabetes Predictor", layout="centered")
@@ -87,9 +170,9 @@ st.title("🩺 Diabetes Risk Predictor")
 st.markdown("Enter the patient data below to predict diabetes risk.")
 
 # Load model
-model, features = load_model_data()
+predict_risk, features, features_lower = load_model_data()
 
-if model is None or features is None:
+if predict_risk is None or features is None:
     st.stop()
 
 # Show info about the tool
@@ -97,103 +180,121 @@ with st.expander("ℹ️ About this tool"):
     st.markdown("""
     <div class="info-box">
         <p>This tool uses machine learning to assess diabetes risk based on clinical measurements. 
-        Each field below includes guidance on how to obtain accurate measurements.</p>
+        The Measurement Guide tab explains how to obtain accurate measurements for each field.</p>
         <p><strong>Note:</strong> This is a screening tool only. Always confirm with appropriate laboratory tests and clinical evaluation.</p>
     </div>
     """, unsafe_allow_html=True)
 
-# Collect user input with educational content
-inputs = []
-for feature in features:
-    feature_lower = feature.lower()
-    
-    # Check if we have educational content for this feature
-    if feature_lower in FEATURE_EDUCATION:
-        edu_info = FEATURE_EDUCATION[feature_lower]
-        
-        st.markdown(f"### {edu_info['title']}")
-        st.markdown(f"*{edu_info['description']}*")
-        
-        # Input field with appropriate constraints
-        if feature_lower == 'age':
-            value = st.number_input(
-                f"Enter {feature}:",
-                min_value=0,
-                max_value=120,
-                value=30,
-                step=1,
-                help=f"Normal range: {edu_info['normal_range']}"
-            )
-        elif feature_lower == 'pregnancies':
-            value = st.number_input(
-                f"Enter {feature}:",
-                min_value=0,
-                max_value=20,
-                value=0,
-                step=1,
-                help=f"Normal range: {edu_info['normal_range']}"
-            )
-        else:
-            value = st.number_input(
-                f"Enter {feature}:",
-                min_value=0.0,
-                value=0.0,
-                step=0.1,
-                help=f"Normal range: {edu_info['normal_range']}"
-            )
-        
-        # Show measurement guidance
-        st.markdown(f"""
-        <div class="measurement-tip">
-            <strong>📋 How to measure:</strong> {edu_info['how_to_measure']}<br>
-            <strong>💡 Clinical tips:</strong> {edu_info['tips']}<br>
-            <strong>📊 Normal range:</strong> {edu_info['normal_range']}
-        </div>
-        """, unsafe_allow_html=True)
+# Collect user input: one editable row with a typed column per feature
+column_config = {}
+defaults = {}
+for feature, feature_lower in zip(features, features_lower):
+    spec = FEATURE_INPUTS.get(feature_lower, DEFAULT_INPUT)
+    edu_info = FEATURE_EDUCATION.get(feature_lower)
+    column_config[feature] = st.column_config.NumberColumn(
+        feature,
+        help=f"{edu_info['title']}. Normal range: {edu_info['normal_range']}" if edu_info else None,
+        min_value=spec['min_value'],
+        max_value=spec['max_value'],
+        step=spec['step'],
+        required=True
+    )
+    defaults[feature] = spec['value']
+
+# The row to score lives in session state as a float32 array and is only
+# updated when the form is submitted, so scoring has nothing to convert
+default_row = np.fromiter(defaults.values(), dtype=np.float32, count=len(features)).reshape(1, -1)
+if "input_row" not in st.session_state:
+    st.session_state.input_row = default_row.copy()
+
+# Patient form and prediction. The form holds grid edits until Predict is
+# pressed, and submitting reruns only this fragment, not the whole page.
+@st.fragment
+def predict_fragment():
+    with st.form("patient_form"):
+        st.data_editor(
+            pd.DataFrame([defaults]),
+            column_config=column_config,
+            hide_index=True,
+            key="patient_data"
+        )
+        submitted = st.form_submit_button(
+            "🔍 Predict Diabetes Risk",
+            on_click=update_input_row,
+            args=(features, default_row)
+        )
+
+    if submitted:
+        input_array = st.session_state.input_row
+        if np.all(input_array >= 0):
+            prediction, risk = score(input_array)
         
-        inputs.append(value)
-        st.markdown("---")
-    else:
-        # Fallback for any features not in our education dictionary
-        value = st.number_input(f"Enter {feature}:", min_value=0.0, step=0.1)
-        inputs.append(value)
-
-# Predict button
-if st.button("🔍 Predict Diabetes Risk"):
-    if all(x >= 0 for x in inputs):
-        input_array = np.array([inputs])
-        prediction = model.predict(input_array)[0]
+            # Show prediction with additional context
+            if prediction == 1:
+                st.error("🔴 **High Risk: The patient is likely to have diabetes**")
+                st.markdown("""
+                **Recommended Next Steps:**
+                - Perform confirmatory testing (HbA1c, fasting glucose)
+                - Provide lifestyle counseling
+                - Consider referral to endocrinologist
+                - Schedule regular monitoring
+                """)
+            else:
+                st.success("🟢 **Low Risk: The patient is unlikely to have diabetes**")
+                st.markdown("""
+                **Recommended Next Steps:**
+                - Continue regular health screenings
+                - Maintain healthy lifestyle habits
+                - Annual diabetes risk assessment
+                - Monitor for risk factor changes
+                """)
         
-        # Show prediction with additional context
-        if prediction == 1:
-            st.error("🔴 **High Risk: The patient is likely to have diabetes**")
-            st.markdown("""
-            **Recommended Next Steps:**
-            - Perform confirmatory testing (HbA1c, fasting glucose)
-            - Provide lifestyle counseling
-            - Consider referral to endocrinologist
-            - Schedule regular monitoring
-            """)
+            # Show probability
+            st.metric("Risk Probability", f"{risk * 100:.1f}%")
+            
         else:
-            st.success("🟢 **Low Risk: The patient is unlikely to have diabetes**")
-            st.markdown("""
-            **Recommended Next Steps:**
-            - Continue regular health screenings
-            - Maintain healthy lifestyle habits
-            - Annual diabetes risk assessment
-            - Monitor for risk factor changes
-            """)
-        
-        # Show probability if available
+            st.error("❌ Please enter valid values for all fields.")
+
+# Patient entry, measurement guide and batch upload each get their own tab.
+# Switching tabs reruns the script so hidden tabs can skip their work.
+patient_tab, guide_tab, batch_tab = st.tabs(
+    ["📝 Patient Data", "📖 Measurement Guide", "📂 Batch Prediction"],
+    on_change="rerun"
+)
+
+with patient_tab:
+    predict_fragment()
+
+with guide_tab:
+    # Measurement guidance is only built while its tab is open
+    if guide_tab.open:
+        columns = st.columns(2)
+        guide_features = [feature_lower for feature_lower in features_lower if feature_lower in FEATURE_EDUCATION]
+        for i, feature_lower in enumerate(guide_features):
+            edu_info = FEATURE_EDUCATION[feature_lower]
+            with columns[i % 2].expander(edu_info['title']):
+                st.markdown(f"*{edu_info['description']}*")
+                st.markdown(FEATURE_EDUCATION_HTML[feature_lower], unsafe_allow_html=True)
+
+with batch_tab:
+    uploaded = st.file_uploader(
+        "Upload a CSV with one patient per row",
+        type="csv",
+        help=f"Required columns: {', '.join(features)}"
+    )
+    if uploaded is not None:
         try:
-            prediction_proba = model.predict_proba(input_array)[0]
-            risk_percentage = prediction_proba[1] * 100
-            st.metric("Risk Probability", f"{risk_percentage:.1f}%")
-        except:
-            pass  # Some models may not have predict_proba
-            
-    else:
-        st.error("❌ Please enter valid values for all fields.")
+            results, missing = predict_batch(uploaded.getvalue())
+        except ValueError:
+            st.error("❌ Could not read the uploaded file. Please upload a CSV with numeric values.")
+        else:
+            if missing:
+                st.error(f"❌ Missing columns: {', '.join(missing)}")
+            else:
+                invalid = results["Prediction"] == "Invalid input"
+                if invalid.any():
+                    st.warning(f"⚠️ {invalid.sum()} row(s) have blank or negative values and were not scored.")
+                st.dataframe(results, hide_index=True)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,21 @@
+"""Export the trained model and feature list to the formats the app loads.
+
+The model is saved in XGBoost's native UBJSON format (diabetes_model.ubj):
+it loads without unpickling arbitrary Python objects and stays readable
+across XGBoost versions. The feature names are saved as a plain JSON list
+(model_features.json). Re-run after retraining:
+
+    python convert_model.py
+"""
+import json
+
+import joblib
+
+model = joblib.load("diabetes_model.pkl")
+model.save_model("diabetes_model.ubj")
+print("✅ Saved diabetes_model.ubj")
+
+features = list(joblib.load("model_features.pkl"))
+with open("model_features.json", "w") as f:
+    json.dump(features, f)
+print("✅ Saved model_features.json")